@@ -14,6 +14,14 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-change-this')
 
+from deadline import RequestDeadline, DeadlineExceeded
+from notion_helper import (
+    NotionAPIHelper,
+    NotionUnavailableError,
+    notion_circuit_breaker,
+    validate_database_schema
+)
+
 # Import database functions (this might fail if DATABASE_URL is not set)
 try:
     from database import (
@@ -23,7 +31,6 @@ try:
         test_database_connection,
         get_user_count
     )
-    from notion_helper import NotionAPIHelper, validate_database_schema
     
     # Test database connection on startup
     if test_database_connection():
@@ -118,6 +125,7 @@ def health_check():
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
         "users": get_user_count(),
+        "notion_circuit": notion_circuit_breaker.snapshot(),
         "service": "telegram-notion-setup-assistant"
     })
 
@@ -273,9 +281,12 @@ def verify_setup(telegram_id):
         flash('Integration token should start with "secret_"', 'error')
         return redirect(url_for('setup_page', telegram_id=telegram_id))
     
+    # Overall time budget shared by every Notion and database call below
+    deadline = RequestDeadline()
+    
     try:
         # Test Notion connection
-        notion_helper = NotionAPIHelper(token)
+        notion_helper = NotionAPIHelper(token, deadline=deadline)
         
         # Test basic connection
         connection_success, user_info = notion_helper.test_connection()
@@ -316,7 +327,7 @@ def verify_setup(telegram_id):
             'user_name': user_name if user_name else user_info.get('name', 'Unknown')
         }
         
-        store_user_integration_data(telegram_id, integration_data)
+        store_user_integration_data(telegram_id, integration_data, deadline=deadline)
         
         return render_template_string("""
         <!DOCTYPE html>
@@ -371,10 +382,20 @@ def verify_setup(telegram_id):
         database_title=database_info.get('title', [{}])[0].get('text', {}).get('content', 'Your Database')
         )
         
+    except DeadlineExceeded as e:
+        logger.warning(f"Setup verification for user {telegram_id} ran out of time")
+        flash(str(e), 'error')
+        return redirect(url_for('setup_page', telegram_id=telegram_id))
+    except NotionUnavailableError as e:
+        logger.warning(f"Setup verification for user {telegram_id} short-circuited: Notion unavailable")
+        flash(str(e), 'error')
+        return redirect(url_for('setup_page', telegram_id=telegram_id))
     except Exception as e:
         logger.error(f"Setup verification error for user {telegram_id}: {str(e)}")
         flash(f'Setup failed: {str(e)}', 'error')
         return redirect(url_for('setup_page', telegram_id=telegram_id))
+    finally:
+        logger.info(f"Setup verification timings for user {telegram_id}: {deadline.breakdown()}")
 
 @app.route('/api/user/<int:telegram_id>')
 def get_user_data(telegram_id):
@@ -0,0 +1,2 @@
+# test_db.py is a manual connectivity script that needs a live DATABASE_URL
+collect_ignore = ["test_db.py"]
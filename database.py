@@ -1,8 +1,11 @@
 import os
+import math
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
+from psycopg2 import errors
+from contextlib import contextmanager, nullcontext
 import logging
+from deadline import DeadlineExceeded, DEADLINE_EXCEEDED_MESSAGE
 
 logger = logging.getLogger(__name__)
 
@@ -20,56 +23,99 @@ if not DATABASE_URL:
 else:
     logger.info(f"✅ Found DATABASE_URL: {DATABASE_URL[:50]}...")
 
+# libpq treats any connect_timeout below 2 seconds as 2 seconds
+MIN_CONNECT_TIMEOUT = 2
+
+def _deadline_step(deadline, name):
+    """Time a step against the request deadline, or do nothing without one"""
+    return deadline.step(name) if deadline is not None else nullcontext()
+
+def _apply_statement_timeout(cursor, deadline):
+    """Bound the next statements by whatever is left of the request deadline"""
+    if deadline is not None:
+        cursor.execute("SELECT set_config('statement_timeout', %s, false)",
+                       (str(max(1, int(deadline.timeout() * 1000))),))
+
+def _connect(deadline=None):
+    """Open a connection, bounding connect time by the request deadline
+
+    The remaining budget is rounded down to whole seconds; if less than
+    libpq's minimum is left the connection is not attempted at all.
+    """
+    if deadline is None:
+        return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    
+    with deadline.step('db_connect'):
+        connect_timeout = math.floor(deadline.timeout())
+        if connect_timeout < MIN_CONNECT_TIMEOUT:
+            raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)
+        return psycopg2.connect(
+            DATABASE_URL,
+            cursor_factory=RealDictCursor,
+            connect_timeout=connect_timeout
+        )
+
+def _is_timeout_error(e):
+    """Whether a psycopg2 error came from a statement or connect timeout"""
+    if isinstance(e, errors.QueryCanceled):
+        return True
+    return isinstance(e, psycopg2.OperationalError) and 'timeout expired' in str(e)
+
 @contextmanager
-def get_db_connection():
+def get_db_connection(deadline=None):
     """Context manager for database connections"""
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable not set")
     
     conn = None
     try:
-        conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+        conn = _connect(deadline)
         yield conn
         conn.commit()
     except Exception as e:
         if conn:
             conn.rollback()
         logger.error(f"Database error: {e}")
+        if deadline is not None and not isinstance(e, DeadlineExceeded):
+            if _is_timeout_error(e) or deadline.expired():
+                raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE) from e
         raise
     finally:
         if conn:
             conn.close()
 
-def store_user_integration_data(telegram_id: int, integration_data: dict):
+def store_user_integration_data(telegram_id: int, integration_data: dict, deadline=None):
     """Store internal integration data for a user"""
-    with get_db_connection() as conn:
+    with get_db_connection(deadline) as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO users (
-                telegram_id, notion_access_token, notion_workspace_id,
-                notion_workspace_name, notion_bot_id, notion_database_id,
-                user_name, updated_at
-            ) VALUES (%(telegram_id)s, %(access_token)s, %(workspace_id)s,
-                     %(workspace_name)s, %(bot_id)s, %(database_id)s,
-                     %(user_name)s, NOW())
-            ON CONFLICT (telegram_id) 
-            DO UPDATE SET
-                notion_access_token = EXCLUDED.notion_access_token,
-                notion_workspace_id = EXCLUDED.notion_workspace_id,
-                notion_workspace_name = EXCLUDED.notion_workspace_name,
-                notion_bot_id = EXCLUDED.notion_bot_id,
-                notion_database_id = EXCLUDED.notion_database_id,
-                user_name = EXCLUDED.user_name,
-                updated_at = NOW()
-        """, {
-            'telegram_id': telegram_id,
-            'access_token': integration_data['access_token'],
-            'workspace_id': integration_data.get('workspace_id', 'internal'),
-            'workspace_name': integration_data.get('workspace_name', 'Personal Workspace'),
-            'bot_id': integration_data.get('bot_id', 'internal_integration'),
-            'database_id': integration_data.get('database_id'),
-            'user_name': integration_data.get('user_name', 'Unknown')
-        })
+        with _deadline_step(deadline, 'db_upsert'):
+            _apply_statement_timeout(cursor, deadline)
+            cursor.execute("""
+                INSERT INTO users (
+                    telegram_id, notion_access_token, notion_workspace_id,
+                    notion_workspace_name, notion_bot_id, notion_database_id,
+                    user_name, updated_at
+                ) VALUES (%(telegram_id)s, %(access_token)s, %(workspace_id)s,
+                         %(workspace_name)s, %(bot_id)s, %(database_id)s,
+                         %(user_name)s, NOW())
+                ON CONFLICT (telegram_id) 
+                DO UPDATE SET
+                    notion_access_token = EXCLUDED.notion_access_token,
+                    notion_workspace_id = EXCLUDED.notion_workspace_id,
+                    notion_workspace_name = EXCLUDED.notion_workspace_name,
+                    notion_bot_id = EXCLUDED.notion_bot_id,
+                    notion_database_id = EXCLUDED.notion_database_id,
+                    user_name = EXCLUDED.user_name,
+                    updated_at = NOW()
+            """, {
+                'telegram_id': telegram_id,
+                'access_token': integration_data['access_token'],
+                'workspace_id': integration_data.get('workspace_id', 'internal'),
+                'workspace_name': integration_data.get('workspace_name', 'Personal Workspace'),
+                'bot_id': integration_data.get('bot_id', 'internal_integration'),
+                'database_id': integration_data.get('database_id'),
+                'user_name': integration_data.get('user_name', 'Unknown')
+            })
 
 def get_user_integration_data(telegram_id: int):
     """Get integration data for a user"""
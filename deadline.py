@@ -0,0 +1,56 @@
+import os
+import time
+from contextlib import contextmanager
+
+# Keep below the gunicorn worker timeout (30s by default) so requests abort cleanly
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '25.0'))
+
+DEADLINE_EXCEEDED_MESSAGE = "The request took too long and was stopped. Please try again in a moment."
+
+class DeadlineExceeded(Exception):
+    """Raised when a request has used up its time budget"""
+
+class RequestDeadline:
+    """Time budget shared by every step of a single request"""
+
+    def __init__(self, budget=REQUEST_DEADLINE_SECONDS):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.steps = []
+
+    def elapsed(self):
+        """Seconds spent since the request started"""
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        """Seconds left in the budget (never negative)"""
+        return max(0.0, self.budget - self.elapsed())
+
+    def expired(self):
+        """Whether the budget is used up"""
+        return self.remaining() <= 0
+
+    def timeout(self):
+        """Remaining budget to use as a step timeout, raising if none is left"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)
+        return remaining
+
+    @contextmanager
+    def step(self, name):
+        """Time a step against the budget; refuses to start once it is spent"""
+        self.timeout()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.monotonic() - started))
+
+    def breakdown(self):
+        """Per-step timings plus totals, for logging"""
+        return {
+            "budget": self.budget,
+            "elapsed": round(self.elapsed(), 3),
+            "steps": [{"name": name, "seconds": round(seconds, 3)} for name, seconds in self.steps]
+        }
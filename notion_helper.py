@@ -1,24 +1,192 @@
+import os
+import threading
+import time
 import requests
 import logging
+from deadline import DeadlineExceeded, DEADLINE_EXCEEDED_MESSAGE
 
 logger = logging.getLogger(__name__)
 
+NOTION_UNAVAILABLE_MESSAGE = "Notion is currently unavailable. Please try again in a few minutes."
+
+class NotionUnavailableError(Exception):
+    """Raised when Notion calls are short-circuited because the API is degraded"""
+
+class NotionCircuitBreaker:
+    """Circuit breaker guarding calls to api.notion.com
+
+    Closed: calls go through; consecutive failures (errors, 5xx responses or
+    calls slower than the latency threshold) are counted. Once the failure
+    threshold is reached the breaker opens and calls fail fast. After the
+    recovery timeout it goes half-open and lets a single probe through: a
+    healthy probe closes it again, a failed one re-opens it.
+
+    State is kept per worker process.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, latency_threshold=5.0, recovery_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = None
+        self.last_state_change = time.time()
+        self.state_changes = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, new_state):
+        """Change state and log the transition (caller holds the lock)"""
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        self.last_state_change = time.time()
+        self.state_changes += 1
+        if new_state == self.OPEN:
+            self.opened_at = time.monotonic()
+            logger.warning(f"Notion circuit breaker {old_state} -> {new_state} after {self.failure_count} failures")
+        else:
+            logger.info(f"Notion circuit breaker {old_state} -> {new_state}")
+
+    def before_request(self):
+        """Raise NotionUnavailableError if the call should not be attempted
+
+        Returns True when the call is the half-open probe.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    raise NotionUnavailableError(NOTION_UNAVAILABLE_MESSAGE)
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise NotionUnavailableError(NOTION_UNAVAILABLE_MESSAGE)
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, probe=False):
+        """Record a healthy Notion call; only the half-open probe closes the breaker"""
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+                self.failure_count = 0
+                self._transition(self.CLOSED)
+            elif self.state == self.CLOSED:
+                self.failure_count = 0
+            # Late results from calls started before the breaker opened are ignored
+
+    def record_failure(self, probe=False):
+        """Record a failed or too slow Notion call"""
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+                self.failure_count += 1
+                self._transition(self.OPEN)
+            elif self.state == self.CLOSED:
+                self.failure_count += 1
+                if self.failure_count >= self.failure_threshold:
+                    self._transition(self.OPEN)
+
+    def record_cancelled(self, probe=False):
+        """Record a call abandoned because the request ran out of time"""
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+
+    def record_result(self, status_code, elapsed, probe=False):
+        """Classify a completed call; 4xx responses are caller errors, not outages"""
+        if status_code >= 500 or elapsed > self.latency_threshold:
+            self.record_failure(probe)
+        else:
+            self.record_success(probe)
+
+    def snapshot(self):
+        """Current breaker state for monitoring"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+                "failure_threshold": self.failure_threshold,
+                "latency_threshold": self.latency_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "state_changes": self.state_changes,
+                "last_state_change": self.last_state_change
+            }
+
+notion_circuit_breaker = NotionCircuitBreaker(
+    failure_threshold=int(os.getenv('NOTION_CB_FAILURE_THRESHOLD', '5')),
+    latency_threshold=float(os.getenv('NOTION_CB_LATENCY_THRESHOLD', '5.0')),
+    recovery_timeout=float(os.getenv('NOTION_CB_RECOVERY_TIMEOUT', '30.0'))
+)
+
+# Upper bound for a single Notion call, so hanging calls still reach the breaker
+NOTION_REQUEST_TIMEOUT = float(os.getenv(
+    'NOTION_REQUEST_TIMEOUT', str(notion_circuit_breaker.latency_threshold + 5.0)
+))
+NOTION_CONNECT_TIMEOUT = 3.0
+
 class NotionAPIHelper:
     """Helper class for Notion API operations"""
     
-    def __init__(self, access_token):
+    def __init__(self, access_token, deadline=None):
         self.access_token = access_token
+        self.deadline = deadline
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Notion-Version": "2022-06-28",
             "Content-Type": "application/json"
         }
     
+    def _request(self, step, method, url, **kwargs):
+        """Send a request to Notion through the circuit breaker, bounded by the request deadline"""
+        if self.deadline is None:
+            return self._send(method, url, **kwargs)
+        with self.deadline.step(step):
+            # Split the budget so connect plus read together cannot exceed it
+            total = min(NOTION_REQUEST_TIMEOUT, self.deadline.timeout())
+            connect_timeout = min(total / 2, NOTION_CONNECT_TIMEOUT)
+            response = self._send(method, url, timeout=(connect_timeout, total - connect_timeout), **kwargs)
+            if self.deadline.expired():
+                raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)
+            return response
+    
+    def _send(self, method, url, **kwargs):
+        """Perform the HTTP call and report its outcome to the circuit breaker"""
+        probe = notion_circuit_breaker.before_request()
+        kwargs.setdefault('timeout', NOTION_REQUEST_TIMEOUT)
+        started = time.monotonic()
+        try:
+            response = requests.request(method, url, headers=self.headers, **kwargs)
+        except requests.Timeout as e:
+            elapsed = time.monotonic() - started
+            if self.deadline is not None and self.deadline.expired() and elapsed <= notion_circuit_breaker.latency_threshold:
+                # Our budget ran out before Notion could be judged slow
+                notion_circuit_breaker.record_cancelled(probe)
+            else:
+                notion_circuit_breaker.record_failure(probe)
+            if self.deadline is not None and self.deadline.expired():
+                raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE) from e
+            raise
+        except Exception:
+            notion_circuit_breaker.record_failure(probe)
+            raise
+        notion_circuit_breaker.record_result(response.status_code, time.monotonic() - started, probe)
+        return response
+    
     def test_connection(self):
         """Test if the access token is valid"""
         try:
-            response = requests.get("https://api.notion.com/v1/users/me", headers=self.headers)
+            response = self._request("notion_test_connection", "GET", "https://api.notion.com/v1/users/me")
             return response.status_code == 200, response.json() if response.status_code == 200 else response.text
+        except (NotionUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error testing Notion connection: {e}")
             return False, str(e)
@@ -26,8 +194,10 @@ class NotionAPIHelper:
     def get_database_info(self, database_id):
         """Get information about a specific database"""
         try:
-            response = requests.get(f"https://api.notion.com/v1/databases/{database_id}", headers=self.headers)
+            response = self._request("notion_get_database", "GET", f"https://api.notion.com/v1/databases/{database_id}")
             return response.status_code == 200, response.json() if response.status_code == 200 else response.text
+        except (NotionUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error getting database info: {e}")
             return False, str(e)
@@ -44,8 +214,10 @@ class NotionAPIHelper:
                 }
             }
             
-            response = requests.post("https://api.notion.com/v1/pages", headers=self.headers, json=data)
+            response = self._request("notion_create_test_page", "POST", "https://api.notion.com/v1/pages", json=data)
             return response.status_code == 200, response.json() if response.status_code == 200 else response.text
+        except (NotionUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error creating test page: {e}")
             return False, str(e)
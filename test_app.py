@@ -0,0 +1,127 @@
+import logging
+
+import pytest
+
+import app as app_module
+from deadline import DeadlineExceeded, DEADLINE_EXCEEDED_MESSAGE
+from notion_helper import NotionUnavailableError, NOTION_UNAVAILABLE_MESSAGE
+
+VALID_DATABASE = {
+    'id': 'db-id',
+    'title': [{'text': {'content': 'Tasks'}}],
+    'properties': {
+        'Name': {'type': 'title'},
+        'Start at': {'type': 'date'},
+        'Finish at': {'type': 'date'},
+        'Priority': {'type': 'multi_select'},
+        'Progress': {'type': 'status'}
+    }
+}
+
+
+class FakeNotionHelper:
+    """Replaces NotionAPIHelper; each result is a tuple or an exception to raise"""
+
+    results = {}
+
+    def __init__(self, access_token, deadline=None):
+        self.deadline = deadline
+
+    def _result(self, name):
+        result = self.results.get(name, (True, {}))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def test_connection(self):
+        return self._result('test_connection')
+
+    def get_database_info(self, database_id):
+        return self._result('get_database_info')
+
+    def create_test_page(self, database_id):
+        return self._result('create_test_page')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    stored = []
+    monkeypatch.setattr(app_module, 'NotionAPIHelper', FakeNotionHelper)
+    monkeypatch.setattr(app_module, 'store_user_integration_data',
+                        lambda *args, **kwargs: stored.append((args, kwargs)))
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        client.stored = stored
+        yield client
+
+
+def _verify(client, results):
+    FakeNotionHelper.results = {
+        'test_connection': (True, {'name': 'Ada'}),
+        'get_database_info': (True, VALID_DATABASE),
+        'create_test_page': (True, {}),
+        **results
+    }
+    return client.post('/verify/42', data={'token': 'secret_abc', 'database_id': 'db-id'})
+
+
+def _flashes(client):
+    with client.session_transaction() as session:
+        return [message for _, message in session.get('_flashes', [])]
+
+
+def _timings_logged(caplog):
+    return [r for r in caplog.records if 'Setup verification timings for user 42' in r.getMessage()]
+
+
+def _raise_deadline(*args, **kwargs):
+    raise DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)
+
+
+@pytest.mark.parametrize("results", [
+    {'test_connection': DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)},
+    {'get_database_info': DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)},
+    {'create_test_page': DeadlineExceeded(DEADLINE_EXCEEDED_MESSAGE)}
+])
+def test_deadline_in_notion_call_flashes_message(client, caplog, results):
+    with caplog.at_level(logging.INFO):
+        response = _verify(client, results)
+
+    assert response.status_code == 302
+    assert _flashes(client) == [DEADLINE_EXCEEDED_MESSAGE]
+    assert len(_timings_logged(caplog)) == 1
+
+
+def test_deadline_in_database_store_flashes_message(client, caplog, monkeypatch):
+    monkeypatch.setattr(app_module, 'store_user_integration_data', _raise_deadline)
+    with caplog.at_level(logging.INFO):
+        response = _verify(client, {})
+
+    assert response.status_code == 302
+    assert _flashes(client) == [DEADLINE_EXCEEDED_MESSAGE]
+    assert len(_timings_logged(caplog)) == 1
+
+
+@pytest.mark.parametrize("results", [
+    {'test_connection': (False, 'unauthorized')},
+    {'get_database_info': (False, 'not found')},
+    {'get_database_info': (True, {'properties': {}})},
+    {'create_test_page': (False, 'forbidden')},
+    {'test_connection': NotionUnavailableError(NOTION_UNAVAILABLE_MESSAGE)},
+    {'get_database_info': RuntimeError('boom')},
+    {}
+])
+def test_every_exit_path_logs_breakdown(client, caplog, results):
+    with caplog.at_level(logging.INFO):
+        _verify(client, results)
+
+    assert len(_timings_logged(caplog)) == 1
+
+
+def test_success_passes_deadline_to_store(client):
+    response = _verify(client, {})
+
+    assert response.status_code == 200
+    (args, kwargs), = client.stored
+    assert args[0] == 42
+    assert kwargs['deadline'] is not None
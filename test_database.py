@@ -0,0 +1,94 @@
+import psycopg2
+import pytest
+from psycopg2 import errors
+
+import database
+from deadline import DeadlineExceeded, RequestDeadline
+
+
+class FakeCursor:
+    def __init__(self, error=None):
+        self.error = error
+
+    def execute(self, query, params=None):
+        if self.error is not None and 'INSERT' in query:
+            raise self.error
+
+
+class FakeConnection:
+    def __init__(self, error=None):
+        self.error = error
+
+    def cursor(self):
+        return FakeCursor(self.error)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePostgres:
+    """Records connect() calls; `error` is raised on connect or by the upsert"""
+
+    def __init__(self):
+        self.calls = []
+        self.error = None
+
+    def connect(self, dsn, **kwargs):
+        self.calls.append(kwargs)
+        if isinstance(self.error, psycopg2.OperationalError) and not isinstance(self.error, errors.QueryCanceled):
+            raise self.error
+        return FakeConnection(self.error)
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    postgres = FakePostgres()
+    monkeypatch.setattr(database, 'DATABASE_URL', 'postgresql://localhost/test?options=-c%20search_path%3Dapp')
+    monkeypatch.setattr(database.psycopg2, 'connect', postgres.connect)
+    return postgres
+
+
+def _store(deadline):
+    database.store_user_integration_data(42, {'access_token': 'secret_abc'}, deadline=deadline)
+
+
+def test_connect_timeout_rounds_remaining_budget_down(postgres):
+    _store(RequestDeadline(7.9))
+
+    assert postgres.calls[0]['connect_timeout'] == 7
+    assert 'options' not in postgres.calls[0]
+
+
+def test_refuses_to_connect_below_libpq_minimum(postgres):
+    with pytest.raises(DeadlineExceeded):
+        _store(RequestDeadline(1.9))
+
+    assert postgres.calls == []
+
+
+def test_statement_timeout_becomes_deadline_exceeded(postgres):
+    postgres.error = errors.QueryCanceled("canceling statement due to statement timeout")
+
+    with pytest.raises(DeadlineExceeded):
+        _store(RequestDeadline(20.0))
+
+
+def test_connect_timeout_becomes_deadline_exceeded(postgres):
+    postgres.error = psycopg2.OperationalError("connection to server failed: timeout expired")
+
+    with pytest.raises(DeadlineExceeded):
+        _store(RequestDeadline(20.0))
+
+
+def test_other_connect_errors_are_not_deadline_errors(postgres):
+    postgres.error = psycopg2.OperationalError("password authentication failed")
+
+    with pytest.raises(psycopg2.OperationalError) as excinfo:
+        _store(RequestDeadline(20.0))
+    assert not isinstance(excinfo.value, DeadlineExceeded)
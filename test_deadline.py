@@ -0,0 +1,71 @@
+import pytest
+
+import deadline as deadline_module
+from deadline import RequestDeadline, DeadlineExceeded
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deadline_module.time, 'monotonic', lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+def test_remaining_shrinks_with_elapsed_time(clock):
+    deadline = RequestDeadline(10.0)
+    clock(4.0)
+
+    assert deadline.remaining() == 6.0
+    assert deadline.timeout() == 6.0
+    assert not deadline.expired()
+
+
+def test_timeout_raises_once_budget_is_spent(clock):
+    deadline = RequestDeadline(10.0)
+    clock(10.0)
+
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout()
+
+
+def test_step_records_timing(clock):
+    deadline = RequestDeadline(10.0)
+    with deadline.step('first'):
+        clock(1.5)
+    with deadline.step('second'):
+        clock(2.0)
+
+    breakdown = deadline.breakdown()
+    assert breakdown['elapsed'] == 3.5
+    assert breakdown['steps'] == [
+        {'name': 'first', 'seconds': 1.5},
+        {'name': 'second', 'seconds': 2.0}
+    ]
+
+
+def test_step_records_timing_when_step_raises(clock):
+    deadline = RequestDeadline(10.0)
+    with pytest.raises(RuntimeError):
+        with deadline.step('failing'):
+            clock(3.0)
+            raise RuntimeError("boom")
+
+    assert deadline.breakdown()['steps'] == [{'name': 'failing', 'seconds': 3.0}]
+
+
+def test_step_refuses_to_start_when_budget_is_spent(clock):
+    deadline = RequestDeadline(10.0)
+    clock(11.0)
+    ran = []
+
+    with pytest.raises(DeadlineExceeded):
+        with deadline.step('late'):
+            ran.append(True)
+
+    assert ran == []
+    assert deadline.breakdown()['steps'] == []
@@ -0,0 +1,224 @@
+import pytest
+
+import notion_helper
+from deadline import RequestDeadline, DeadlineExceeded
+from notion_helper import NotionAPIHelper, NotionCircuitBreaker, NotionUnavailableError
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = f"status {status_code}"
+
+    def json(self):
+        return {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # deadline and notion_helper share the time module, so this drives both
+    clock = FakeClock()
+    monkeypatch.setattr(notion_helper.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    breaker = NotionCircuitBreaker(failure_threshold=3, latency_threshold=5.0, recovery_timeout=30.0)
+    monkeypatch.setattr(notion_helper, 'notion_circuit_breaker', breaker)
+    return breaker
+
+
+@pytest.fixture
+def notion(monkeypatch, clock):
+    """Queue of (status_code, seconds) results served by a faked requests.request"""
+    responses = []
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        status_code, seconds = responses.pop(0)
+        clock.advance(seconds)
+        return FakeResponse(status_code)
+
+    monkeypatch.setattr(notion_helper.requests, 'request', fake_request)
+    return responses, calls
+
+
+def test_opens_after_consecutive_server_errors(breaker, notion):
+    responses, calls = notion
+    responses.extend([(500, 0.1), (503, 0.1), (502, 0.1)])
+    helper = NotionAPIHelper("secret_x")
+
+    for _ in range(3):
+        success, _ = helper.test_connection()
+        assert not success
+
+    assert breaker.state == NotionCircuitBreaker.OPEN
+    assert len(calls) == 3
+
+
+def test_opens_after_consecutive_slow_calls(breaker, notion):
+    responses, _ = notion
+    responses.extend([(200, 6.0)] * 3)
+    helper = NotionAPIHelper("secret_x")
+
+    for _ in range(3):
+        helper.test_connection()
+
+    assert breaker.state == NotionCircuitBreaker.OPEN
+
+
+def test_client_error_resets_failure_count(breaker, notion):
+    responses, _ = notion
+    responses.extend([(500, 0.1), (500, 0.1), (401, 0.1), (500, 0.1), (500, 0.1)])
+    helper = NotionAPIHelper("secret_x")
+
+    for _ in range(5):
+        helper.test_connection()
+
+    assert breaker.state == NotionCircuitBreaker.CLOSED
+    assert breaker.failure_count == 2
+
+
+def test_open_breaker_fails_fast_without_http_call(breaker, notion):
+    responses, calls = notion
+    responses.extend([(500, 0.1)] * 3)
+    helper = NotionAPIHelper("secret_x")
+    for _ in range(3):
+        helper.test_connection()
+
+    with pytest.raises(NotionUnavailableError):
+        helper.get_database_info("db")
+    with pytest.raises(NotionUnavailableError):
+        helper.create_test_page("db")
+
+    assert len(calls) == 3
+
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == NotionCircuitBreaker.OPEN
+
+
+def test_half_open_lets_single_probe_through(breaker, clock):
+    _trip(breaker)
+    clock.advance(29.0)
+    with pytest.raises(NotionUnavailableError):
+        breaker.before_request()
+
+    clock.advance(1.0)
+    assert breaker.before_request() is True
+    assert breaker.state == NotionCircuitBreaker.HALF_OPEN
+    with pytest.raises(NotionUnavailableError):
+        breaker.before_request()
+
+
+def test_healthy_probe_closes_breaker(breaker, clock):
+    _trip(breaker)
+    clock.advance(30.0)
+    probe = breaker.before_request()
+
+    breaker.record_result(200, 0.1, probe)
+
+    assert breaker.state == NotionCircuitBreaker.CLOSED
+    assert breaker.failure_count == 0
+    assert breaker.before_request() is False
+
+
+def test_failed_probe_reopens_breaker(breaker, clock):
+    _trip(breaker)
+    clock.advance(30.0)
+    probe = breaker.before_request()
+
+    breaker.record_result(500, 0.1, probe)
+
+    assert breaker.state == NotionCircuitBreaker.OPEN
+    with pytest.raises(NotionUnavailableError):
+        breaker.before_request()
+
+
+def test_late_results_from_before_open_change_nothing(breaker, clock):
+    late_probe = breaker.before_request()
+    _trip(breaker)
+
+    breaker.record_success(late_probe)
+    breaker.record_failure(late_probe)
+    assert breaker.state == NotionCircuitBreaker.OPEN
+    assert breaker.failure_count == breaker.failure_threshold
+
+    clock.advance(30.0)
+    breaker.before_request()
+    breaker.record_success(late_probe)
+    assert breaker.state == NotionCircuitBreaker.HALF_OPEN
+
+
+def test_cancelled_probe_frees_probe_slot(breaker, clock):
+    _trip(breaker)
+    clock.advance(30.0)
+    probe = breaker.before_request()
+
+    breaker.record_cancelled(probe)
+
+    assert breaker.state == NotionCircuitBreaker.HALF_OPEN
+    assert breaker.before_request() is True
+
+
+@pytest.mark.parametrize("budget,elapsed", [(25.0, 0.0), (25.0, 20.0), (4.0, 3.0), (1.0, 0.0)])
+def test_request_splits_remaining_budget(breaker, notion, clock, budget, elapsed):
+    responses, calls = notion
+    responses.append((200, 0.1))
+    deadline = RequestDeadline(budget)
+    clock.advance(elapsed)
+    remaining = deadline.remaining()
+
+    NotionAPIHelper("secret_x", deadline=deadline).test_connection()
+
+    connect, read = calls[0][2]['timeout']
+    assert 0 < connect <= notion_helper.NOTION_CONNECT_TIMEOUT
+    assert read > 0
+    assert connect + read <= min(notion_helper.NOTION_REQUEST_TIMEOUT, remaining)
+    assert deadline.breakdown()['steps'][0]['name'] == 'notion_test_connection'
+
+
+def test_request_without_deadline_uses_default_timeout(breaker, notion):
+    responses, calls = notion
+    responses.append((200, 0.1))
+
+    NotionAPIHelper("secret_x").test_connection()
+
+    assert calls[0][2]['timeout'] == notion_helper.NOTION_REQUEST_TIMEOUT
+
+
+def test_request_raises_when_budget_expires_during_call(breaker, notion, clock):
+    responses, _ = notion
+    responses.append((200, 3.0))
+    deadline = RequestDeadline(2.0)
+
+    with pytest.raises(DeadlineExceeded):
+        NotionAPIHelper("secret_x", deadline=deadline).get_database_info("db")
+
+
+def test_request_refuses_to_start_without_budget(breaker, notion, clock):
+    _, calls = notion
+    deadline = RequestDeadline(2.0)
+    clock.advance(2.0)
+
+    with pytest.raises(DeadlineExceeded):
+        NotionAPIHelper("secret_x", deadline=deadline).create_test_page("db")
+    assert calls == []